@@ -27,19 +27,83 @@ conditions:
 - Write a match(key, creds) method that will take two arguments: the user's
   key, and the user's retrieved credentials. Return a boolean value that
   indicates whether the match is True or False.
+- Add the class to the tuple used to build _AUTH_TYPES at the bottom of this
+  module so that stored credentials of that type can be validated.
 """
 
 import base64
+import binascii
 import hashlib
+import hmac
 import os
-import six
 import string
-import sys
 
 
-#: Maximum length any valid token should ever be.
+#: Maximum length any valid token, or any user credentials, should ever be.
 MAX_TOKEN_LENGTH = 5000
 
+# Hash constructors, resolved once rather than on every call.
+_SHA1 = hashlib.sha1
+_SHA512 = hashlib.sha512
+
+
+def _to_bytes(value):
+    """Encode text to UTF-8, leaving bytes untouched
+
+    :param value: Text or bytes
+    :returns: The value as bytes
+    """
+    if isinstance(value, bytes):
+        return value
+    return value.encode('utf8')
+
+
+def _salted_key(salt, key):
+    """Build the input hashed by the salted auth types
+
+    :param salt: Salt for hashing, as text or bytes
+    :param key: User's secret key, as text or bytes
+    :returns: The salt followed by the key, as bytes
+    """
+    return b''.join((_to_bytes(salt), _to_bytes(key)))
+
+
+def _compare_creds(expected, creds):
+    """Compare two credential strings in constant time
+
+    :param expected: Credentials computed from the user-supplied key
+    :param creds: User's stored credentials
+    :returns: True if both credentials are equal, False otherwise
+    """
+    return hmac.compare_digest(_to_bytes(expected), _to_bytes(creds))
+
+
+def _stored_raw_digest(creds, auth_type, salt, hash_len):
+    """Extract the raw digest from stored salted credentials
+
+    Only the shape of the credentials is checked here, which is not secret;
+    credentials of the wrong shape are rejected before any hashing is done.
+    The digest must be lowercase hex, as produced by encode.
+
+    :param creds: User's stored credentials, eg: "sha1:<salt>$<hex digest>"
+    :param auth_type: Expected auth_type prefix, eg: b"sha1"
+    :param salt: Salt expected in the credentials
+    :param hash_len: Expected length of the hex digest
+    :returns: The digest as raw bytes, or None if the credentials don't have
+              the expected shape
+    """
+    creds = _to_bytes(creds)
+    prefix = b''.join((auth_type, b':', _to_bytes(salt), b'$'))
+    if len(creds) != len(prefix) + hash_len or not creds.startswith(prefix):
+        return None
+    hex_digest = creds[len(prefix):]
+    if hex_digest != hex_digest.lower():
+        return None
+    try:
+        return binascii.unhexlify(hex_digest)
+    except (TypeError, ValueError):
+        return None
+
 
 def validate_creds(creds):
     """Parse and validate user credentials whether format is right
@@ -48,15 +112,15 @@ def validate_creds(creds):
     :returns: Auth_type class instance and parsed user credentials in dict
     :raises ValueError: If credential format is wrong (eg: bad auth_type)
     """
+    if len(creds) > MAX_TOKEN_LENGTH:
+        raise ValueError("Credentials too long")
     try:
         auth_type, auth_rest = creds.split(':', 1)
     except ValueError:
         raise ValueError("Missing ':' in %s" % creds)
-    authtypes = sys.modules[__name__]
-    auth_encoder = getattr(authtypes, auth_type.title(), None)
+    auth_encoder = _AUTH_ENCODERS.get(auth_type.lower())
     if auth_encoder is None:
         raise ValueError('Invalid auth_type: %s' % auth_type)
-    auth_encoder = auth_encoder()
     parsed_creds = dict(type=auth_type, salt=None, hash=None)
     parsed_creds.update(auth_encoder.validate(auth_rest))
     return auth_encoder, parsed_creds
@@ -77,7 +141,7 @@ class Plaintext(object):
         :param key: User's secret key
         :returns: A string representing user credentials
         """
-        return "plaintext:%s" % key
+        return 'plaintext:' + key
 
     def match(self, key, creds, **kwargs):
         """Checks whether the user-provided key matches the user's credentials
@@ -88,7 +152,23 @@ class Plaintext(object):
                        other auth_type classes
         :returns: True if the supplied key is valid, False otherwise
         """
-        return self.encode(key) == creds
+        if key is None:
+            return False
+        return _compare_creds(self.encode(key), creds)
+
+    def match_many(self, keys, creds, **kwargs):
+        """Checks each of several user-provided keys against the user's
+        credentials
+
+        :param keys: Iterable of user-supplied keys
+        :param creds: User's stored credentials
+        :param kwargs: Extra keyword args for compatibility reason with
+                       other auth_type classes
+        :returns: Generator of booleans, one per key, as returned by match
+        """
+        creds = _to_bytes(creds)
+        for key in keys:
+            yield key is not None and _compare_creds(self.encode(key), creds)
 
     def validate(self, auth_rest):
         """Validate user credentials whether format is right for Plaintext
@@ -111,19 +191,30 @@ class Sha1(object):
     the only ones that will be used by swauth.
     """
 
-    def encode_w_salt(self, salt, key):
+    def _raw_digest(self, salt, key):
+        """Hashes a user key with salt.
+
+        :param salt: Salt for hashing
+        :param key: User's secret key
+        :returns: The raw (not hex-encoded) digest
+        """
+        return _SHA1(_salted_key(salt, key)).digest()
+
+    def encode_w_salt(self, salt, key, salt_bytes=None):
         """Encodes a user key with salt into a particular format. The result of
         this method will be used internally.
 
         :param salt: Salt for hashing
         :param key: User's secret key
+        :param salt_bytes: Salt already encoded to bytes, if available
         :returns: A string representing user credentials
         """
-        enc_key = salt + key
-        if not six.PY2:
-            enc_key = enc_key.encode('utf8')
-        enc_val = hashlib.sha1(enc_key).hexdigest()
-        return "sha1:%s$%s" % (salt, enc_val)
+        if salt_bytes is None:
+            salt_bytes = salt
+        # hexdigest() is a native str on both py2 and py3, so a configured
+        # salt that is a py2 byte str is never coerced to unicode here.
+        enc_val = _SHA1(_salted_key(salt_bytes, key)).hexdigest()
+        return 'sha1:' + salt + '$' + enc_val
 
     def encode(self, key):
         """Encodes a user key into a particular format. The result of this method
@@ -135,10 +226,11 @@ class Sha1(object):
         :param key: User's secret key
         :returns: A string representing user credentials
         """
-        salt = self.salt or base64.b64encode(os.urandom(32)).rstrip()
-        if not six.PY2 and isinstance(salt, bytes):
-            salt = salt.decode('ascii')
-        return self.encode_w_salt(salt, key)
+        if self.salt:
+            return self.encode_w_salt(self.salt, key)
+        salt_bytes = base64.b64encode(os.urandom(32)).rstrip()
+        salt = salt_bytes.decode('ascii')
+        return self.encode_w_salt(salt, key, salt_bytes)
 
     def match(self, key, creds, salt, **kwargs):
         """Checks whether the user-provided key matches the user's credentials
@@ -150,7 +242,36 @@ class Sha1(object):
                        other auth_type classes
         :returns: True if the supplied key is valid, False otherwise
         """
-        return self.encode_w_salt(salt, key) == creds
+        if key is None:
+            return False
+        stored_digest = _stored_raw_digest(creds, b'sha1', salt, 40)
+        if stored_digest is None:
+            return False
+        return hmac.compare_digest(self._raw_digest(salt, key), stored_digest)
+
+    def match_many(self, keys, creds, salt, **kwargs):
+        """Checks each of several user-provided keys against the user's
+        credentials
+
+        The stored credentials are parsed and the salt is encoded only once
+        for all keys.
+
+        :param keys: Iterable of user-supplied keys
+        :param creds: User's stored credentials
+        :param salt: Salt for hashing
+        :param kwargs: Extra keyword args for compatibility reason with
+                       other auth_type classes
+        :returns: Generator of booleans, one per key, as returned by match
+        """
+        stored_digest = _stored_raw_digest(creds, b'sha1', salt, 40)
+        if stored_digest is None:
+            for key in keys:
+                yield False
+            return
+        salt = _to_bytes(salt)
+        for key in keys:
+            yield key is not None and hmac.compare_digest(
+                self._raw_digest(salt, key), stored_digest)
 
     def validate(self, auth_rest):
         """Validate user credentials whether format is right for Sha1
@@ -160,16 +281,15 @@ class Sha1(object):
         :raises ValueError: If credentials' part doesn't contain delimiter
                             between a salt and a hash.
         """
-        try:
-            auth_salt, auth_hash = auth_rest.split('$')
-        except ValueError:
+        auth_salt, sep, auth_hash = auth_rest.partition('$')
+        if not sep:
             raise ValueError("Missing '$' in %s" % auth_rest)
 
         if len(auth_salt) == 0:
             raise ValueError("Salt must have non-zero length!")
         if len(auth_hash) != 40:
             raise ValueError("Hash must have 40 chars!")
-        if not all(c in string.hexdigits for c in auth_hash):
+        if auth_hash.strip(string.hexdigits):
             raise ValueError("Hash must be hexadecimal!")
 
         return dict(salt=auth_salt, hash=auth_hash)
@@ -184,19 +304,30 @@ class Sha512(object):
     the only ones that will be used by swauth.
     """
 
-    def encode_w_salt(self, salt, key):
+    def _raw_digest(self, salt, key):
+        """Hashes a user key with salt.
+
+        :param salt: Salt for hashing
+        :param key: User's secret key
+        :returns: The raw (not hex-encoded) digest
+        """
+        return _SHA512(_salted_key(salt, key)).digest()
+
+    def encode_w_salt(self, salt, key, salt_bytes=None):
         """Encodes a user key with salt into a particular format. The result of
         this method will be used internal.
 
         :param salt: Salt for hashing
         :param key: User's secret key
+        :param salt_bytes: Salt already encoded to bytes, if available
         :returns: A string representing user credentials
         """
-        enc_key = '%s%s' % (salt, key)
-        if not six.PY2:
-            enc_key = enc_key.encode('utf8')
-        enc_val = hashlib.sha512(enc_key).hexdigest()
-        return "sha512:%s$%s" % (salt, enc_val)
+        if salt_bytes is None:
+            salt_bytes = salt
+        # hexdigest() is a native str on both py2 and py3, so a configured
+        # salt that is a py2 byte str is never coerced to unicode here.
+        enc_val = _SHA512(_salted_key(salt_bytes, key)).hexdigest()
+        return 'sha512:' + salt + '$' + enc_val
 
     def encode(self, key):
         """Encodes a user key into a particular format. The result of this method
@@ -208,10 +339,11 @@ class Sha512(object):
         :param key: User's secret key
         :returns: A string representing user credentials
         """
-        salt = self.salt or base64.b64encode(os.urandom(32)).rstrip()
-        if not six.PY2 and isinstance(salt, bytes):
-            salt = salt.decode('ascii')
-        return self.encode_w_salt(salt, key)
+        if self.salt:
+            return self.encode_w_salt(self.salt, key)
+        salt_bytes = base64.b64encode(os.urandom(32)).rstrip()
+        salt = salt_bytes.decode('ascii')
+        return self.encode_w_salt(salt, key, salt_bytes)
 
     def match(self, key, creds, salt, **kwargs):
         """Checks whether the user-provided key matches the user's credentials
@@ -223,7 +355,36 @@ class Sha512(object):
                        other auth_type classes
         :returns: True if the supplied key is valid, False otherwise
         """
-        return self.encode_w_salt(salt, key) == creds
+        if key is None:
+            return False
+        stored_digest = _stored_raw_digest(creds, b'sha512', salt, 128)
+        if stored_digest is None:
+            return False
+        return hmac.compare_digest(self._raw_digest(salt, key), stored_digest)
+
+    def match_many(self, keys, creds, salt, **kwargs):
+        """Checks each of several user-provided keys against the user's
+        credentials
+
+        The stored credentials are parsed and the salt is encoded only once
+        for all keys.
+
+        :param keys: Iterable of user-supplied keys
+        :param creds: User's stored credentials
+        :param salt: Salt for hashing
+        :param kwargs: Extra keyword args for compatibility reason with
+                       other auth_type classes
+        :returns: Generator of booleans, one per key, as returned by match
+        """
+        stored_digest = _stored_raw_digest(creds, b'sha512', salt, 128)
+        if stored_digest is None:
+            for key in keys:
+                yield False
+            return
+        salt = _to_bytes(salt)
+        for key in keys:
+            yield key is not None and hmac.compare_digest(
+                self._raw_digest(salt, key), stored_digest)
 
     def validate(self, auth_rest):
         """Validate user credentials whether format is right for Sha512
@@ -233,16 +394,24 @@ class Sha512(object):
         :raises ValueError: If credentials' part doesn't contain delimiter
                             between a salt and a hash.
         """
-        try:
-            auth_salt, auth_hash = auth_rest.split('$')
-        except ValueError:
+        auth_salt, sep, auth_hash = auth_rest.partition('$')
+        if not sep:
             raise ValueError("Missing '$' in %s" % auth_rest)
 
         if len(auth_salt) == 0:
             raise ValueError("Salt must have non-zero length!")
         if len(auth_hash) != 128:
             raise ValueError("Hash must have 128 chars!")
-        if not all(c in string.hexdigits for c in auth_hash):
+        if auth_hash.strip(string.hexdigits):
             raise ValueError("Hash must be hexadecimal!")
 
         return dict(salt=auth_salt, hash=auth_hash)
+
+
+#: Auth type classes keyed by the lowercase name used in stored credentials.
+_AUTH_TYPES = dict((cls.__name__.lower(), cls)
+                   for cls in (Plaintext, Sha1, Sha512))
+
+#: Shared auth type instances returned by validate_creds; these are
+#: stateless as far as validate and match are concerned.
+_AUTH_ENCODERS = dict((name, cls()) for name, cls in _AUTH_TYPES.items())
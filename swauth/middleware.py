@@ -1114,6 +1114,12 @@ class Swauth(object):
                 swauth.authtypes.validate_creds(key_hash)
             except ValueError:
                 return HTTPBadRequest(request=req)
+            auth_value = key_hash
+        else:
+            auth_value = self.auth_encoder().encode(key)
+            # Stored credentials longer than this would never validate
+            if len(auth_value) > swauth.authtypes.MAX_TOKEN_LENGTH:
+                return HTTPBadRequest(request=req)
 
         user_arg = account + ':' + user
         if reseller_admin:
@@ -1140,7 +1146,6 @@ class Swauth(object):
             groups.append('.admin')
         if reseller_admin:
             groups.append('.reseller_admin')
-        auth_value = key_hash or self.auth_encoder().encode(key)
         resp = self.make_pre_authed_request(
             req.environ, 'PUT', path,
             json.dumps({'auth': auth_value,
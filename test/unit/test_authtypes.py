@@ -14,6 +14,7 @@
 # Pablo Llopis 2011
 
 import mock
+import six
 from swauth import authtypes
 import unittest
 
@@ -45,11 +46,21 @@ class TestValidation(unittest.TestCase):
         self.assertEqual(parsed_creds, creds_dict)
         self.assertTrue(isinstance(auth_encoder, authtypes.Sha512))
 
+    def test_validate_creds_auth_type_case(self):
+        creds = 'SHA1:salt$d50dc700c296e23ce5b41f7431a0e01f69010f06'
+        auth_encoder, parsed_creds = authtypes.validate_creds(creds)
+        self.assertEqual(parsed_creds['type'], 'SHA1')
+        self.assertTrue(isinstance(auth_encoder, authtypes.Sha1))
+
     def test_validate_creds_fail(self):
         # wrong format, missing `:`
         creds = 'unknown;keystring'
         self.assertRaisesRegexp(ValueError, "Missing ':' in .*",
                                 authtypes.validate_creds, creds)
+        # too long
+        creds = 'plaintext:' + 'k' * authtypes.MAX_TOKEN_LENGTH
+        self.assertRaisesRegexp(ValueError, "Credentials too long",
+                                authtypes.validate_creds, creds)
         # unknown auth_type
         creds = 'unknown:keystring'
         self.assertRaisesRegexp(ValueError, "Invalid auth_type: .*",
@@ -76,6 +87,14 @@ class TestValidation(unittest.TestCase):
                                 authtypes.validate_creds, creds)
         # wrong sha1 format, wrong format
         creds = 'sha1:salt$' + "z" * 40
+        self.assertRaisesRegexp(ValueError, "Hash must be hexadecimal!",
+                                authtypes.validate_creds, creds)
+        # wrong sha1 format, extra `$`
+        creds = 'sha1:salt$' + "a" * 20 + "$" + "a" * 19
+        self.assertRaisesRegexp(ValueError, "Hash must be hexadecimal!",
+                                authtypes.validate_creds, creds)
+        # wrong sha1 format, non-hex char between hex chars
+        creds = 'sha1:salt$' + "a" * 20 + " " + "a" * 19
         self.assertRaisesRegexp(ValueError, "Hash must be hexadecimal!",
                                 authtypes.validate_creds, creds)
         # wrong sha512 format, missing `$`
@@ -119,6 +138,24 @@ class TestPlaintext(unittest.TestCase):
         match = self.auth_encoder.match('keystring', creds)
         self.assertEqual(match, False)
 
+    def test_plaintext_missing_key_match(self):
+        for creds in ('plaintext:keystring', 'plaintext:None'):
+            match = self.auth_encoder.match(None, creds)
+            self.assertEqual(match, False)
+
+    def test_plaintext_non_ascii_match(self):
+        creds = u'plaintext:\u2603'
+        match = self.auth_encoder.match(u'\u2603', creds)
+        self.assertEqual(match, True)
+        match = self.auth_encoder.match(u'\u2604', creds)
+        self.assertEqual(match, False)
+
+    def test_plaintext_match_many(self):
+        creds = 'plaintext:keystring'
+        matches = self.auth_encoder.match_many(
+            ['other', 'keystring', u'\u2603', None], creds)
+        self.assertEqual(list(matches), [False, True, False, False])
+
 
 class TestSha1(unittest.TestCase):
 
@@ -134,6 +171,15 @@ class TestSha1(unittest.TestCase):
         self.assertEqual('sha1:salt$d50dc700c296e23ce5b41f7431a0e01f69010f06',
                          enc_key)
 
+    def test_sha1_encode_random_salt(self):
+        self.auth_encoder.salt = None
+        creds = self.auth_encoder.encode('keystring')
+        creds_dict = authtypes.validate_creds(creds)[1]
+        self.assertEqual(len(creds_dict['salt']), 44)
+        match = self.auth_encoder.match('keystring', creds, **creds_dict)
+        self.assertEqual(match, True)
+        self.assertNotEqual(creds, self.auth_encoder.encode('keystring'))
+
     def test_sha1_valid_match(self):
         creds = 'sha1:salt$d50dc700c296e23ce5b41f7431a0e01f69010f06'
         creds_dict = dict(type='sha1', salt='salt',
@@ -154,6 +200,70 @@ class TestSha1(unittest.TestCase):
         match = self.auth_encoder.match('keystring2', creds, **creds_dict)
         self.assertEqual(match, False)
 
+    def test_sha1_match_many(self):
+        creds = self.auth_encoder.encode('keystring')
+        creds_dict = authtypes.validate_creds(creds)[1]
+        matches = self.auth_encoder.match_many(
+            ['other', 'keystring', u'\u2603', None], creds, **creds_dict)
+        self.assertEqual(list(matches), [False, True, False, False])
+
+        matches = self.auth_encoder.match_many(
+            ['other', 'keystring', None], creds[:-1], **creds_dict)
+        self.assertEqual(list(matches), [False, False, False])
+
+    def test_sha1_malformed_match(self):
+        creds_dict = dict(type='sha1', salt='salt', hash='a' * 40)
+        for creds in ('sha1:salt$' + 'a' * (40 - 1),
+                      'sha1:salt$' + 'a' * (40 + 1),
+                      'sha1:other$' + 'a' * 40,
+                      'plaintext:salt$' + 'a' * 40):
+            with mock.patch.object(self.auth_encoder, '_raw_digest') as raw:
+                match = self.auth_encoder.match('keystring', creds,
+                                                **creds_dict)
+            self.assertEqual(match, False)
+            self.assertFalse(raw.called)
+
+    def test_sha1_non_ascii_key(self):
+        creds = self.auth_encoder.encode(u'\u2603')
+        creds_dict = authtypes.validate_creds(creds)[1]
+        match = self.auth_encoder.match(u'\u2603', creds, **creds_dict)
+        self.assertEqual(match, True)
+        match = self.auth_encoder.match(u'\u2604', creds, **creds_dict)
+        self.assertEqual(match, False)
+
+    def test_sha1_uppercase_hex_match(self):
+        creds = self.auth_encoder.encode('keystring')
+        salt, _, hex_digest = creds.partition(':')[2].partition('$')
+        creds = 'sha1:' + salt + '$' + hex_digest.upper()
+        creds_dict = authtypes.validate_creds(creds)[1]
+        match = self.auth_encoder.match('keystring', creds, **creds_dict)
+        self.assertEqual(match, False)
+
+    def test_sha1_non_ascii_salt(self):
+        self.auth_encoder.salt = u'sa\xe9lt'
+        if six.PY2:
+            self.auth_encoder.salt = self.auth_encoder.salt.encode('utf8')
+        creds = self.auth_encoder.encode('keystring')
+        self.assertTrue(creds.startswith(
+            'sha1:' + self.auth_encoder.salt + '$'))
+        creds_dict = authtypes.validate_creds(creds)[1]
+        match = self.auth_encoder.match('keystring', creds, **creds_dict)
+        self.assertEqual(match, True)
+        match = self.auth_encoder.match('keystring2', creds, **creds_dict)
+        self.assertEqual(match, False)
+
+    def test_sha1_missing_key_match(self):
+        creds = self.auth_encoder.encode('keystring')
+        creds_dict = authtypes.validate_creds(creds)[1]
+        match = self.auth_encoder.match(None, creds, **creds_dict)
+        self.assertEqual(match, False)
+
+    def test_sha1_non_hex_match(self):
+        creds = 'sha1:salt$' + 'z' * 40
+        creds_dict = dict(type='sha1', salt='salt', hash='z' * 40)
+        match = self.auth_encoder.match('keystring', creds, **creds_dict)
+        self.assertEqual(match, False)
+
 
 class TestSha512(unittest.TestCase):
 
@@ -170,6 +280,15 @@ class TestSha512(unittest.TestCase):
                          '8f445cc2367b7daa3f0e8f3dcfe798e426b9e332776c8da59c'
                          '0c11d4832931d1bf48830f670ecc6ceb04fbad0f', enc_key)
 
+    def test_sha512_encode_random_salt(self):
+        self.auth_encoder.salt = None
+        creds = self.auth_encoder.encode('keystring')
+        creds_dict = authtypes.validate_creds(creds)[1]
+        self.assertEqual(len(creds_dict['salt']), 44)
+        match = self.auth_encoder.match('keystring', creds, **creds_dict)
+        self.assertEqual(match, True)
+        self.assertNotEqual(creds, self.auth_encoder.encode('keystring'))
+
     def test_sha512_valid_match(self):
         creds = ('sha512:salt$482e73705fac6909e2d78e8bbaf65ac3ca14738f445cc2'
                  '367b7daa3f0e8f3dcfe798e426b9e332776c8da59c0c11d4832931d1bf'
@@ -202,6 +321,70 @@ class TestSha512(unittest.TestCase):
         match = self.auth_encoder.match('keystring2', creds, **creds_dict)
         self.assertEqual(match, False)
 
+    def test_sha512_match_many(self):
+        creds = self.auth_encoder.encode('keystring')
+        creds_dict = authtypes.validate_creds(creds)[1]
+        matches = self.auth_encoder.match_many(
+            ['other', 'keystring', u'\u2603', None], creds, **creds_dict)
+        self.assertEqual(list(matches), [False, True, False, False])
+
+        matches = self.auth_encoder.match_many(
+            ['other', 'keystring', None], creds[:-1], **creds_dict)
+        self.assertEqual(list(matches), [False, False, False])
+
+    def test_sha512_malformed_match(self):
+        creds_dict = dict(type='sha512', salt='salt', hash='a' * 128)
+        for creds in ('sha512:salt$' + 'a' * (128 - 1),
+                      'sha512:salt$' + 'a' * (128 + 1),
+                      'sha512:other$' + 'a' * 128,
+                      'plaintext:salt$' + 'a' * 128):
+            with mock.patch.object(self.auth_encoder, '_raw_digest') as raw:
+                match = self.auth_encoder.match('keystring', creds,
+                                                **creds_dict)
+            self.assertEqual(match, False)
+            self.assertFalse(raw.called)
+
+    def test_sha512_non_ascii_key(self):
+        creds = self.auth_encoder.encode(u'\u2603')
+        creds_dict = authtypes.validate_creds(creds)[1]
+        match = self.auth_encoder.match(u'\u2603', creds, **creds_dict)
+        self.assertEqual(match, True)
+        match = self.auth_encoder.match(u'\u2604', creds, **creds_dict)
+        self.assertEqual(match, False)
+
+    def test_sha512_uppercase_hex_match(self):
+        creds = self.auth_encoder.encode('keystring')
+        salt, _, hex_digest = creds.partition(':')[2].partition('$')
+        creds = 'sha512:' + salt + '$' + hex_digest.upper()
+        creds_dict = authtypes.validate_creds(creds)[1]
+        match = self.auth_encoder.match('keystring', creds, **creds_dict)
+        self.assertEqual(match, False)
+
+    def test_sha512_non_ascii_salt(self):
+        self.auth_encoder.salt = u'sa\xe9lt'
+        if six.PY2:
+            self.auth_encoder.salt = self.auth_encoder.salt.encode('utf8')
+        creds = self.auth_encoder.encode('keystring')
+        self.assertTrue(creds.startswith(
+            'sha512:' + self.auth_encoder.salt + '$'))
+        creds_dict = authtypes.validate_creds(creds)[1]
+        match = self.auth_encoder.match('keystring', creds, **creds_dict)
+        self.assertEqual(match, True)
+        match = self.auth_encoder.match('keystring2', creds, **creds_dict)
+        self.assertEqual(match, False)
+
+    def test_sha512_missing_key_match(self):
+        creds = self.auth_encoder.encode('keystring')
+        creds_dict = authtypes.validate_creds(creds)[1]
+        match = self.auth_encoder.match(None, creds, **creds_dict)
+        self.assertEqual(match, False)
+
+    def test_sha512_non_hex_match(self):
+        creds = 'sha512:salt$' + 'z' * 128
+        creds_dict = dict(type='sha512', salt='salt', hash='z' * 128)
+        match = self.auth_encoder.match('keystring', creds, **creds_dict)
+        self.assertEqual(match, False)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -3089,6 +3089,41 @@ class TestAuth(unittest.TestCase):
         self.assertEqual(resp.status_int, 400)
         self.assertEqual(self.test_auth.app.calls, 0)
 
+    def test_put_user_key_max_length(self):
+        key = 'k' * (MAX_TOKEN_LENGTH - len('plaintext:'))
+
+        self.test_auth.app = FakeApp(iter([
+            ('200 Ok', {'X-Container-Meta-Account-Id': 'AUTH_cfa'}, ''),
+            # PUT of user object
+            ('201 Created', {}, '')]))
+        resp = Request.blank('/auth/v2/act/usr',
+            environ={'REQUEST_METHOD': 'PUT'},
+            headers={'X-Auth-Admin-User': '.super_admin',
+                     'X-Auth-Admin-Key': 'supertest',
+                     'X-Auth-User-Key': key}
+            ).get_response(self.test_auth)
+        self.assertEqual(resp.status_int, 201)
+        self.assertEqual(self.test_auth.app.calls, 2)
+        self.assertEqual(json.loads(self.test_auth.app.request.body),
+            {"groups": [{"name": "act:usr"}, {"name": "act"}],
+             "auth": "plaintext:" + key})
+
+    def test_put_user_key_too_long(self):
+        key = 'k' * (MAX_TOKEN_LENGTH - len('plaintext:') + 1)
+
+        self.test_auth.app = FakeApp(iter([
+            ('200 Ok', {'X-Container-Meta-Account-Id': 'AUTH_cfa'}, ''),
+            # PUT of user object
+            ('201 Created', {}, '')]))
+        resp = Request.blank('/auth/v2/act/usr',
+            environ={'REQUEST_METHOD': 'PUT'},
+            headers={'X-Auth-Admin-User': '.super_admin',
+                     'X-Auth-Admin-Key': 'supertest',
+                     'X-Auth-User-Key': key}
+            ).get_response(self.test_auth)
+        self.assertEqual(resp.status_int, 400)
+        self.assertEqual(self.test_auth.app.calls, 0)
+
     def test_delete_user_bad_creds(self):
         self.test_auth.app = FakeApp(iter([
             ('200 Ok', {}, json.dumps({"groups": [{"name": "act2:adm"},
@@ -3773,6 +3808,26 @@ class TestAuth(unittest.TestCase):
             headers={'X-Auth-Admin-User': 'act:rdm',
                      'X-Auth-Admin-Key': 'bad'}), 'act'))
 
+    def test_is_account_admin_fail_no_key(self):
+        self.test_auth.app = FakeApp(iter([
+            ('200 Ok', {},
+             json.dumps({'auth': 'plaintext:key',
+                         'groups': [{'name': 'act:adm'}, {'name': 'act'},
+                                    {'name': '.admin'}]}))]))
+        self.assertTrue(not self.test_auth.is_account_admin(Request.blank('/',
+            headers={'X-Auth-Admin-User': 'act:adm'}), 'act'))
+
+    def test_is_account_admin_fail_no_key_sha1(self):
+        sha1_key = ("sha1:T0YFdhqN4uDRWiYLxWa7H2T8AewG4fEYQyJFRLsgcfk=$46c58"
+                    "07eb8a32e8f404fea9eaaeb60b7e1207ff1")
+        self.test_auth.app = FakeApp(iter([
+            ('200 Ok', {},
+             json.dumps({'auth': sha1_key,
+                         'groups': [{'name': 'act:adm'}, {'name': 'act'},
+                                    {'name': '.admin'}]}))]))
+        self.assertTrue(not self.test_auth.is_account_admin(Request.blank('/',
+            headers={'X-Auth-Admin-User': 'act:adm'}), 'act'))
+
     def test_reseller_admin_but_account_is_internal_use_only(self):
         req = Request.blank('/v1/AUTH_.auth',
                             environ={'REQUEST_METHOD': 'GET'})